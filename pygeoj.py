@@ -137,11 +137,61 @@ and modify according to the MIT license, see license.txt
 
 __version__ = "1.0.0"
 
+import sys
+import os
+import io
+import re
+import math
+import glob
+import collections
+import multiprocessing
+import multiprocessing.pool
+import heapq
+import tempfile
+import array
+import hashlib
+import struct
+
 try:
     import simplejson as json
 except:
     import json
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+try:
+    basestring
+except NameError:
+    basestring = str
+
+try:
+    integer_types = (int, long)
+except NameError:
+    integer_types = (int,)
+
+try:
+    array.array("q")
+    _INTCODE = "q"
+except ValueError:
+    _INTCODE = "l"
+
+# string values longer than this are not interned when intern_values="auto"
+INTERN_MAXLENGTH = 64
+
+# number of characters reserved for the file bbox when saving, so it can be updated in place when appending
+BBOX_WIDTH = 128
+
+# number of bits per axis of the grid that space filling curve keys are computed on
+CURVE_ORDER = 16
+
 class Geometry:
     """
     A geometry instance, as an object representation of GeoJSON's geometry dictinoary item,
@@ -161,7 +211,7 @@ class Geometry:
         Parameters:
         
         - **obj**:
-            Another geometry instance, an object with the \_\_geo_interface__ or a geojson dictionary of the Geometry type
+            Another geometry instance, an object with the \\_\\_geo_interface__ or a geojson dictionary of the Geometry type
         - **type** (optional):
             The type of geometry. Point, MultiPoint, LineString, MultiLineString,
             Polygon, or MultiPolygon. 
@@ -256,6 +306,22 @@ class Geometry:
         if "bbox" in self._data:
             del self._data["bbox"]
 
+    def content_hash(self, precision=None):
+        """
+        Calculates a stable hash of the geometry's type and coordinates, ignoring any bbox.
+        Coordinates are compared as floats, so that for instance 1 and 1.0 hash the same. 
+
+        Parameters:
+
+        - **precision** (optional): The number of decimals to round coordinates to before hashing,
+            so that nearly identical geometries hash the same (defaults to no rounding). 
+
+        Returns:
+
+        - A hexadecimal hash string. 
+        """
+        return _geometryhash(self._data, precision)
+
     def validate(self, fixerrors=True):
         """
         Validates that the geometry is correctly formatted according to the geometry type. 
@@ -341,7 +407,7 @@ class Feature(object):
 
         Parameters:
 
-        - **obj**: Another feature instance, an object with the \_\_geo_interface__ or a geojson dictionary of the Feature type.
+        - **obj**: Another feature instance, an object with the \\_\\_geo_interface__ or a geojson dictionary of the Feature type.
         - **geometry** (optional): Anything that the Geometry instance can accept.
         - **properties** (optional): A dictionary of key-value property pairs.
         """
@@ -389,6 +455,21 @@ class Feature(object):
     def geometry(self, value):
         self._data["geometry"] = Geometry(value).__geo_interface__
 
+    def content_hash(self, precision=None, on="both"):
+        """
+        Calculates a stable hash of the feature's geometry, properties, or both. 
+
+        Parameters:
+
+        - **precision** (optional): The number of decimals to round coordinates to before hashing (defaults to no rounding). 
+        - **on** (optional): What to hash, either "geometry", "properties", or "both" (defaults to "both").
+
+        Returns:
+
+        - A hexadecimal hash string. 
+        """
+        return _featurehash((self._data, on, precision))
+
     def validate(self, fixerrors=True):
         """
         Validates that the feature is correctly formatted.
@@ -434,9 +515,12 @@ class GeojsonFile:
     - **bbox**: The bounding box surrounding all geometries in the file. Read only. You may need to call .update_bbox() to make sure this one is up-to-date.
     - **all_attributes**: Collect and return a list of all attributes/properties/fields used in any of the features. Read only. 
     - **common_attributes**: Collects and returns a list of attributes/properties/fields common to all features. Read only. 
+    - **intern_stats**: When loaded from a filepath, a dictionary reporting how many keys and values were
+        deduplicated during parsing and the approximate number of bytes saved, otherwise None. 
     """
     
-    def __init__(self, filepath=None, data=None, skiperrors=False, fixerrors=True, **kwargs):
+    def __init__(self, filepath=None, data=None, skiperrors=False, fixerrors=True, intern_keys=True, intern_values="auto",
+                 properties=None, bbox=None, where=None, geometry=True, **kwargs):
         """
         Can load from data or from a file,
         which can then be read or edited.
@@ -454,15 +538,41 @@ class GeojsonFile:
         - **data** (optional): A complete geojson dictionary to load.
         - **skiperrors** (optional): Throws away any features that fail to validate (defaults to False).
         - **fixerrors** (optional): Attempts to auto fix any minor errors without raising exceptions (defaults to True).
+        - **intern_keys** (optional): Shares a single copy of each property key string across all features
+            when loading from a filepath (defaults to True).
+        - **intern_values** (optional): Shares a single copy of repeated string values when loading from a filepath.
+            True interns all strings, False none, and "auto" only those up to INTERN_MAXLENGTH characters,
+            which are the likely categorical values (defaults to "auto").
+        - **properties** (optional): A list of property fields to keep, dropping all others. 
+        - **bbox** (optional): Only keep features whose geometry bbox intersects this [xmin, ymin, xmax, ymax] region. 
+        - **where** (optional): A function that receives each Feature instance and returns True if it should be kept. 
+        - **geometry** (optional): Set to False to drop all geometries and only keep the properties (defaults to True).
+
+        The properties, bbox, where, and geometry filters are applied to each feature as soon as
+        it has been parsed and validated, so that unwanted data never accumulates in memory. 
+        Streaming the file one feature at a time parses somewhat slower than an unfiltered load
+        (about 10-20%), so the filters pay off when they drop a large share of the data. 
         """
         
-        if filepath:
-            data = self._loadfilepath(filepath, **kwargs)
-            if validate(data, skiperrors=skiperrors, fixerrors=fixerrors):
-                self._data = data
-                self._prepdata()
-        elif data:
-            if validate(data, skiperrors=skiperrors, fixerrors=fixerrors):
+        self.intern_stats = None
+        hook = _LoadHook(intern_keys, intern_values,
+                         properties=properties, bbox=bbox, where=where, geometry=geometry,
+                         skiperrors=skiperrors, fixerrors=fixerrors)
+        if filepath or data:
+            if filepath:
+                data = self._loadfilepath(filepath, hook, **kwargs)
+            elif hook.filtering:
+                # filter into a copy, leaving the caller's dictionary untouched
+                data = dict(data)
+                data["features"] = hook.filter_features(data.get("features", []))
+                # the bbox no longer matches the kept features
+                data.pop("bbox", None)
+            if hook.filtering:
+                # the kept features were already validated by the hook
+                valid = _validatecollection(data, fixerrors=fixerrors)
+            else:
+                valid = validate(data, skiperrors=skiperrors, fixerrors=fixerrors)
+            if valid:
                 self._data = data
                 self._prepdata()
         else:
@@ -515,7 +625,7 @@ class GeojsonFile:
     def bbox(self):
         if not self._data.get("bbox"):
             self.update_bbox()
-        return self._data["bbox"]
+        return self._data.get("bbox")
 
     @property
     def all_attributes(self):
@@ -553,7 +663,7 @@ class GeojsonFile:
 
         Parameters:
 
-        - **obj**: Another feature instance, an object with the \_\_geo_interface__ or a geojson dictionary of the Feature type.
+        - **obj**: Another feature instance, an object with the \\_\\_geo_interface__ or a geojson dictionary of the Feature type.
         - **geometry** (optional): Anything that the Geometry instance can accept.
         - **properties** (optional): A dictionary of key-value property pairs.
         """
@@ -650,6 +760,56 @@ class GeojsonFile:
             if link_type:
                 crs["properties"]["type"] = link_type
 
+    def transform(self, to):
+        """
+        Transforms the coordinates of all geometries in the file.
+        All coordinates are collected and transformed as one batch, using NumPy arrays
+        when NumPy is installed, and any existing feature bboxes are removed and the
+        file bbox recalculated. 
+
+        The built-in projections convert between long/lat WGS84 (EPSG:4326) and
+        Web Mercator (EPSG:3857), and update the crs of the file. Affine transforms
+        can be applied to any coordinates, and leave the crs unchanged. 
+
+        Parameters:
+
+        - **to**: Either the crs to project to, "EPSG:4326" or "EPSG:3857", or an affine matrix
+            given as a sequence (a, b, c, d, e, f) or a nested 2x3 or 3x3 matrix, so that 
+            x' = a*x + b*y + c and y' = d*x + e*y + f. 
+        """
+        if isinstance(to, (basestring, int)):
+            target = _epsgcode(to)
+            source = _epsgcode(self.crs["properties"].get("name", ""))
+            if target not in (4326, 3857):
+                raise ValueError("Can only transform to EPSG:4326 or EPSG:3857")
+            if source not in (4326, 3857):
+                raise Exception("Can only transform from EPSG:4326 or EPSG:3857, not from the file's crs: %s" % self.crs)
+            if source == target: return
+            kind,params = ("tomercator" if target == 3857 else "frommercator"), None
+        else:
+            target = None
+            kind,params = "affine", _affineparams(to)
+        
+        geoms = [featuredict["geometry"] for featuredict in self._data["features"] if featuredict.get("geometry")]
+        xs,ys = [],[]
+        for geom in geoms:
+            _collectxy(geom["coordinates"], xs, ys)
+
+        xs,ys = _transformxy(kind, params, xs, ys)
+        xys = iter(zip(xs, ys))
+        for geom in geoms:
+            geom["coordinates"] = _rebuildxy(geom["coordinates"], xys)
+            geom.pop("bbox", None)
+
+        if target == 3857:
+            self.define_crs(type="name", name="urn:ogc:def:crs:EPSG::3857")
+        elif target == 4326:
+            self.define_crs(type="name", name="urn:ogc:def:crs:OGC:2:84")
+        if xs:
+            self._data["bbox"] = _positionsbbox(xs, ys)
+        else:
+            self._data.pop("bbox", None)
+
     def update_bbox(self):
         """
         Recalculates the bbox region attribute for the entire file.
@@ -657,11 +817,15 @@ class GeojsonFile:
 
         No need to use this method just for saving, because saving
         automatically updates the bbox.
+
+        If none of the features have a geometry, the file bbox is removed.
         """
 
-        xmins, ymins, xmaxs, ymaxs = zip(*(feat.geometry.bbox for feat in self if feat.geometry.type != "Null"))
-        bbox = [min(xmins), min(ymins), max(xmaxs), max(ymaxs)] 
-        self._data["bbox"] = bbox
+        bbox = _bboxunion(feat.geometry.bbox for feat in self if feat.geometry.type != "Null")
+        if bbox is None:
+            self._data.pop("bbox", None)
+        else:
+            self._data["bbox"] = bbox
 
     def add_unique_id(self):
         """
@@ -688,19 +852,170 @@ class GeojsonFile:
             if feature.geometry.type != "Null":
                 feature.geometry._data["bbox"] = Feature(feature).geometry.bbox
 
-    def save(self, savepath, **kwargs):
+    def to_columns(self, fields=None):
+        """
+        Extracts the values of property fields as typed columns, in a single pass over all features.
+        Missing and null values are marked in a null mask. 
+
+        When NumPy is installed the columns are NumPy arrays, otherwise
+        boolean, integer and float columns are array.array instances and
+        all other columns are lists. Null values are filled with False, 0,
+        NaN, or None, respectively. 
+
+        Parameters:
+
+        - **fields** (optional): A list of the fields to extract (defaults to all fields).
+
+        Returns:
+
+        - A dictionary of (values, nullmask) tuples for each field. 
+        """
+        features = self._data["features"]
+        count = len(features)
+        if fields is None:
+            columns = {}
+            for i,featuredict in enumerate(features):
+                for field,value in (featuredict["properties"] or {}).items():
+                    column = columns.get(field)
+                    if column is None:
+                        column = columns[field] = [None] * count
+                    column[i] = value
+        else:
+            columns = dict((field, [None] * count) for field in fields)
+            for i,featuredict in enumerate(features):
+                props = featuredict["properties"] or {}
+                for field in fields:
+                    columns[field][i] = props.get(field)
+        return dict((field, _typedcolumn(values)) for field,values in columns.items())
+
+    @classmethod
+    def from_columns(cls, geometries, columns):
+        """
+        Creates a new geojson file instance from a sequence of geometries and columns of property values,
+        building all features in bulk. 
+
+        Parameters:
+
+        - **geometries**: A sequence of anything that the Geometry instance can accept, one for each feature. 
+        - **columns**: A dictionary of property fields and their values for each feature, either as a sequence or
+            as a (values, nullmask) tuple such as returned by to_columns(), where nulls become None. 
+            The nullmask must be a boolean NumPy array or an array.array of typecode "b". 
+
+        Returns:
+
+        - A GeojsonFile instance. 
+        """
+        geometries = [Geometry(geom).__geo_interface__ for geom in geometries]
+        count = len(geometries)
+        fields,valuelists = [],[]
+        for field,column in columns.items():
+            mask = None
+            if isinstance(column, tuple) and len(column) == 2 and _isnullmask(column[1]):
+                column,mask = column
+            values = column.tolist() if hasattr(column, "tolist") else list(column)
+            if getattr(column, "typecode", None) == "B":
+                values = [bool(value) for value in values]
+            if len(values) != count:
+                raise ValueError("The %r column has %s values, but there are %s geometries" % (field, len(values), count))
+            if mask is not None:
+                values = [None if isnull else value for value,isnull in zip(values, mask)]
+            fields.append(field)
+            valuelists.append(values)
+        geojfile = cls()
+        geojfile._data["features"] = [{"type":"Feature",
+                                       "geometry":geom,
+                                       "properties":dict(zip(fields, row))}
+                                      for geom,row in zip(geometries, zip(*valuelists) if valuelists else [()] * count)]
+        return geojfile
+
+    def drop_duplicates(self, on="both", precision=None, workers=None):
+        """
+        Removes duplicate features in a single hashing pass, keeping the first of each. 
+
+        Parameters:
+
+        - **on** (optional): What makes features duplicates, either identical "geometry", "properties", or "both" (defaults to "both").
+        - **precision** (optional): The number of decimals to round coordinates to before comparing them (defaults to no rounding). 
+        - **workers** (optional): The number of processes to split the hashing between (defaults to a single process). 
+
+        Returns:
+
+        - The number of features that were removed. 
+        """
+        if on not in ("geometry","properties","both"):
+            raise ValueError('on must be either "geometry", "properties" or "both"')
+        features = self._data["features"]
+        args = [(featuredict, on, precision) for featuredict in features]
+        if workers and workers > 1 and len(features) > workers:
+            pool = multiprocessing.Pool(workers)
+            try:
+                hashes = pool.map(_featurehash, args, chunksize=len(args) // (workers * 4) + 1)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            hashes = [_featurehash(arg) for arg in args]
+        
+        seen = set()
+        kept = []
+        for featuredict,hashed in zip(features, hashes):
+            if hashed not in seen:
+                seen.add(hashed)
+                kept.append(featuredict)
+        removed = len(features) - len(kept)
+        features[:] = kept
+        if removed and on == "properties" and self._data.get("bbox"):
+            self.update_bbox()
+        return removed
+
+    def sort_spatial(self, curve="hilbert"):
+        """
+        Reorders the features in place along a space filling curve, so that features
+        that are near each other in space are also near each other in the file. 
+        Each feature is placed by the center of its bbox relative to the bbox of the file,
+        and features with null geometries are placed last. 
+
+        Parameters:
+
+        - **curve** (optional): The type of space filling curve, either "hilbert" or "zorder" (defaults to "hilbert").
+        """
+        features = self._data["features"]
+        filebbox = self.bbox
+        if not filebbox: return
+        bboxes = [Geometry(featuredict.get("geometry")) for featuredict in features]
+        bboxes = [geom.bbox if geom.type != "Null" else None for geom in bboxes]
+        keys = _curvekeys(bboxes, filebbox, curve)
+        order = sorted(range(len(features)), key=keys.__getitem__)
+        features[:] = [features[i] for i in order]
+
+    def save(self, savepath, mode="w", **kwargs):
         """
         Saves the geojson instance to file. To save with a different text encoding use the 'encoding' argument.
 
+        Unless formatting arguments such as 'indent', 'separators' or 'sort_keys' are given,
+        the features are written last, after a fixed width bbox, so that new features
+        can later be appended to the file without rewriting it. If none of the features
+        have a geometry, the space is reserved with an empty bbox array. 
+
         Parameters:
 
         - **savepath**: Filepath to save the file. 
+        - **mode** (optional): "w" to overwrite the file, or "append" to add the features
+            to the end of an existing geojson file, see append() (defaults to "w").
         """
+        if mode == "append" and os.path.exists(savepath):
+            append(savepath, self, **kwargs)
+            return
+        elif mode not in ("w", "append"):
+            raise ValueError('mode must be either "w" or "append"')
         
         self.update_bbox()
-        tempfile = open(savepath,"w")
-        json.dump(self._data, tempfile, **kwargs)
-        tempfile.close()
+        with open(savepath, "w") as fileobj:
+            if _hasformatting(kwargs):
+                json.dump(self._data, fileobj, **kwargs)
+            else:
+                for text in self._iterjson(reservebbox=True, **kwargs):
+                    fileobj.write(text)
         
     def dumps(self):
         """
@@ -709,18 +1024,160 @@ class GeojsonFile:
         """
         
         self.update_bbox()
-        return json.dumps(self._data)
+        return "".join(self._iterjson())
+
+    def iterdumps(self, chunk_size=65536, **kwargs):
+        """
+        Dumps the geojson instance as a generator of utf-8 encoded bytes chunks,
+        for instance to use as a streaming WSGI or ASGI response body. 
+        Features are encoded one at a time, so only about one feature and one
+        chunk is held in memory regardless of the size of the file. 
+
+        The toplevel members are written first, using the stored bbox of the
+        file if it has one rather than recalculating it, so call update_bbox()
+        beforehand if the features have changed since it was calculated. 
+
+        Parameters:
+
+        - **chunk_size** (optional): The minimum number of bytes in each yielded chunk, except the last (defaults to 65536). 
+
+        Note that formatting arguments such as 'indent', 'separators' or 'sort_keys'
+        require the whole file to be dumped at once before it is chunked. 
+        """
+        if not self._data.get("bbox"):
+            self.update_bbox()
+        chunk,size = [],0
+        for text in self._iterjson(**kwargs):
+            data = text.encode("utf-8")
+            chunk.append(data)
+            size += len(data)
+            if size >= chunk_size:
+                yield b"".join(chunk)
+                chunk,size = [],0
+        if chunk:
+            yield b"".join(chunk)
+
+    def freeze(self, name=None):
+        """
+        Packs the file into a read-only block of shared memory, which other processes can
+        attach to by name with attach() and read without each holding their own copy. 
+        Coordinates, feature bboxes, and offsets are stored as flat arrays, and the
+        remaining feature members such as properties as json text that is only
+        decoded when a feature is accessed. Requires Python 3.8 or later. 
+
+        The returned instance owns the shared memory, and should call unlink()
+        once no process needs it anymore. 
+
+        Parameters:
+
+        - **name** (optional): The name of the shared memory block (defaults to a random unique name).
+
+        Returns:
+
+        - A FrozenGeojsonFile instance. 
+        """
+        if shared_memory is None:
+            raise Exception("Freezing requires the multiprocessing.shared_memory module of Python 3.8 or later")
+        features = self._data["features"]
+        bboxes = array.array("d")
+        index = array.array(_INTCODE)
+        coords = array.array("d")
+        parts = array.array(_INTCODE)
+        members = []
+        membersize = 0
+        allfields,commonfields = {},None
+        nan = float("nan")
+        for featuredict in features:
+            geom = Geometry(featuredict.get("geometry"))
+            coordstart = len(coords)
+            if geom.type == "Null":
+                typecode,ndim = 0,0
+            else:
+                typecode = _FROZENTYPES.index(geom.type)
+                ndim = len(_firstposition(geom.coordinates))
+            index.extend((typecode, ndim, coordstart, len(parts), membersize))
+            if typecode:
+                _packcoords(geom.coordinates, _FROZENDEPTHS[typecode], ndim, coords, parts)
+            if len(coords) > coordstart:
+                bboxes.extend(_positionsbbox(coords[coordstart::ndim], coords[coordstart+1::ndim]))
+            else:
+                bboxes.extend((nan,nan,nan,nan))
+            props = featuredict.get("properties") or {}
+            for field in props:
+                allfields.setdefault(field, None)
+            if commonfields is None:
+                commonfields = set(props)
+            else:
+                commonfields.intersection_update(props)
+            memberjson = json.dumps(dict((key,value) for key,value in featuredict.items() if key != "geometry")).encode("utf-8")
+            members.append(memberjson)
+            membersize += len(memberjson)
+        index.extend((0, 0, len(coords), len(parts), membersize))
+        meta = dict((key,value) for key,value in self._data.items() if key != "features")
+        meta["bbox"] = self.bbox
+        meta["all_attributes"] = list(allfields)
+        meta["common_attributes"] = [field for field in allfields if field in (commonfields or ())]
+        metajson = json.dumps(meta).encode("utf-8")
+
+        header = struct.pack(_FROZENHEADER, _FROZENMAGIC, len(features), len(coords), len(parts), membersize, len(metajson))
+        sections = [header, bboxes.tobytes(), index.tobytes(), coords.tobytes(), parts.tobytes()] + members + [metajson]
+        shm = shared_memory.SharedMemory(name=name, create=True, size=sum(len(section) for section in sections))
+        pos = 0
+        for section in sections:
+            shm.buf[pos:pos+len(section)] = section
+            pos += len(section)
+        return FrozenGeojsonFile(shm=shm)
 
     # Internal Methods
 
-    def _loadfilepath(self, filepath, **kwargs):
+    def _iterjson(self, reservebbox=False, **kwargs):
+        """Yields the json text of the file in pieces, first all toplevel
+        members followed by the features array, then one feature at a time.
+        If reservebbox is True the bbox is padded to BBOX_WIDTH characters,
+        as an empty array if the file has no bbox.
+
+        Formatting arguments cannot be applied piece by piece, so
+        with those the whole file is dumped as a single piece."""
+        if _hasformatting(kwargs):
+            yield json.dumps(self._data, **kwargs)
+            return
+        members = []
+        for key,value in self._data.items():
+            if key == "features": continue
+            if key == "bbox" and reservebbox: continue
+            members.append("%s: %s, " % (json.dumps(key), json.dumps(value, **kwargs)))
+        if reservebbox:
+            # the space is reserved even without a bbox, so that features
+            # can be appended in place once there are geometries
+            members.append('"bbox": %s, ' % _bboxjson(self._data.get("bbox"), **kwargs))
+        yield "{" + "".join(members) + '"features": ['
+        for i,featuredict in enumerate(self._data["features"]):
+            featurejson = json.dumps(featuredict, **kwargs)
+            yield ", " + featurejson if i else featurejson
+        yield "]}"
+
+    def _loadfilepath(self, filepath, hook=None, **kwargs):
         """This loads a geojson file into a geojson python
         dictionary using the json module.
+
+        If given, hook is a _LoadHook that interns the json objects
+        as they are parsed. If it also filters, the features array is
+        streamed so that each feature is filtered right after parsing. 
         
         Note: to load with a different text encoding use the encoding argument.
         """
-        with open(filepath, "r") as f:
-            data = json.load(f, **kwargs)
+        if hook and hook.interning:
+            kwargs["object_pairs_hook"] = hook
+        if hook and hook.filtering:
+            data = {}
+            data["features"] = hook.filter_features(_iterfeatures(filepath, data, **kwargs))
+            # the file bbox no longer matches the kept features
+            data.pop("bbox", None)
+        else:
+            with open(filepath, "r") as f:
+                data = json.load(f, **kwargs)
+        if hook and hook.interning:
+            self.intern_stats = hook.stats
         return data
 
     def _prepdata(self):
@@ -737,17 +1194,871 @@ class GeojsonFile:
 
 
 
-# User functions
+class GeojsonDataset(object):
+    """
+    A virtual collection of many geojson files, for instance daily shards of the same data,
+    that can be read as if they were a single geojson file. 
 
-def validate(data, skiperrors=False, fixerrors=True):
-    """Checks that the geojson data is a feature collection, that it
-    contains a proper "features" attribute, and that all features are valid too.
-    Returns True if all goes well.
+    A summary of each file (its bbox, feature count, fields, and modification time) is kept,
+    and optionally cached to disk, so that files are only opened when their features are needed
+    and files that do not intersect a bbox query are never opened. Files are loaded in
+    parallel with a pool of threads. 
 
-    - skiperrors will throw away any features that fail to validate.
-    - fixerrors will attempt to auto fix any minor errors without raising exceptions.
+    Attributes:
+
+    - **paths**: The list of file paths in the dataset. 
+    - **bbox**: The bounding box surrounding all geometries in all the files. Read only. 
+    - **all_attributes**: Collect and return a list of all attributes/properties/fields used in any of the files. Read only. 
+    - **common_attributes**: Collects and returns a list of attributes/properties/fields common to all files. Read only. 
+    """
+
+    def __init__(self, paths, cachepath=None, workers=4, **kwargs):
+        """
+        Parameters:
+
+        - **paths**: A sequence of geojson file paths. 
+        - **cachepath** (optional): The path of a json file in which to keep the file summaries
+            between sessions, so that unchanged files never have to be reopened (defaults to no cache file). 
+        - **workers** (optional): The number of threads to load files with (defaults to 4).
+
+        Any other arguments are passed on to load() when loading each file. 
+        """
+        self.paths = list(paths)
+        self.cachepath = cachepath
+        self.workers = max(1, workers or 1)
+        self._loadkwargs = kwargs
+        self._summaries = {}
+        if cachepath and os.path.exists(cachepath):
+            with open(cachepath, "r") as fileobj:
+                self._summaries = json.load(fileobj)
+
+    def __len__(self):
+        return sum(summary["count"] for summary in self._getsummaries())
+
+    def __iter__(self):
+        """Iterates through and yields each feature in all the files."""
+        for geojfile in self._iterload(self.paths):
+            for feature in geojfile:
+                yield feature
+
+    # Attributes
+
+    @property
+    def bbox(self):
+        return _bboxunion(summary["bbox"] for summary in self._getsummaries())
+
+    @property
+    def all_attributes(self):
+        """
+        Collect and return a list of all attributes/properties/fields used in any of the files.
+        """
+        fields = set()
+        for summary in self._getsummaries():
+            fields.update(summary["fields"])
+        return list(fields)
+
+    @property
+    def common_attributes(self):
+        """
+        Collect and return a list of attributes/properties/fields common to all files.
+        """
+        summaries = [summary for summary in self._getsummaries() if summary["count"]]
+        if not summaries: return []
+        fields = set(summaries[0]["fields"])
+        for summary in summaries[1:]:
+            fields.intersection_update(summary["fields"])
+        return list(fields)
+
+    # Methods
+
+    def query(self, bbox):
+        """
+        Yields each feature whose geometry bbox intersects a region, only
+        opening the files whose bbox intersects the region. 
+
+        Parameters:
+
+        - **bbox**: The [xmin, ymin, xmax, ymax] region to query. 
+        """
+        paths = [path for path,summary in zip(self.paths, self._getsummaries())
+                 if summary["bbox"] and _bboxintersects(summary["bbox"], bbox)]
+        for geojfile in self._iterload(paths, bbox=bbox):
+            for feature in geojfile:
+                yield feature
+
+    # Internal Methods
+
+    def _getsummaries(self):
+        """Returns the summary of each file in the same order as the paths,
+        first summarizing any new or modified files in parallel."""
+        stale = []
+        for path in self.paths:
+            stat = os.stat(path)
+            summary = self._summaries.get(path)
+            if not summary or summary["mtime"] != stat.st_mtime or summary["size"] != stat.st_size:
+                stale.append(path)
+        if stale:
+            for path,geojfile in zip(stale, self._iterload(stale)):
+                stat = os.stat(path)
+                self._summaries[path] = {"mtime":stat.st_mtime,
+                                         "size":stat.st_size,
+                                         "count":len(geojfile),
+                                         "bbox":geojfile.bbox,
+                                         "fields":sorted(geojfile.all_attributes)}
+            if self.cachepath:
+                with open(self.cachepath, "w") as fileobj:
+                    json.dump(self._summaries, fileobj)
+        return [self._summaries[path] for path in self.paths]
+
+    def _iterload(self, paths, **kwargs):
+        """Loads and yields the GeojsonFile of each path in order, using a pool of threads
+        that only loads as many files ahead as there are workers."""
+        loadkwargs = dict(self._loadkwargs, **kwargs)
+        pool = multiprocessing.pool.ThreadPool(self.workers)
+        try:
+            pending = collections.deque()
+            paths = iter(paths)
+            for path in paths:
+                pending.append(pool.apply_async(load, (path,), loadkwargs))
+                if len(pending) >= self.workers: break
+            while pending:
+                geojfile = pending.popleft().get()
+                for path in paths:
+                    pending.append(pool.apply_async(load, (path,), loadkwargs))
+                    break
+                yield geojfile
+        finally:
+            pool.terminate()
+            pool.join()
+
+
+
+class FrozenGeojsonFile(object):
     """
+    A read-only geojson file stored in shared memory, as created by GeojsonFile.freeze(),
+    so that many processes can read the same file without each holding a copy. 
+    Features are decoded from the shared memory each time they are accessed,
+    and changing them does not change the frozen file. 
 
+    Attributes:
+
+    - **name**: The name of the shared memory block, for other processes to attach to. 
+    - **crs**: The geojson formatted dictionary of the file's coordinate reference system. Read only. 
+    - **bbox**: The bounding box surrounding all geometries in the file. Read only. 
+    - **all_attributes**: A list of all attributes/properties/fields used in any of the features. Read only. 
+    - **common_attributes**: A list of attributes/properties/fields common to all features. Read only. 
+    """
+
+    def __init__(self, name=None, shm=None):
+        """
+        Attaches to the shared memory block of a frozen geojson file. 
+
+        On Python versions before 3.13, a process attaching to a block may remove it
+        when it exits, unless it shares the resource tracker of the freezing process,
+        so workers should be started with multiprocessing (fork or spawn) from
+        the process that froze the file. 
+
+        Parameters:
+
+        - **name**: The name of the shared memory block. 
+        """
+        if shm is None:
+            if shared_memory is None:
+                raise Exception("Frozen files require the multiprocessing.shared_memory module of Python 3.8 or later")
+            try:
+                shm = shared_memory.SharedMemory(name=name, track=False)
+            except TypeError:
+                shm = shared_memory.SharedMemory(name=name)
+        self._shm = shm
+        buf = shm.buf
+        headersize = struct.calcsize(_FROZENHEADER)
+        magic,count,ncoords,nparts,membersize,metasize = struct.unpack(_FROZENHEADER, bytes(buf[:headersize]))
+        if magic != _FROZENMAGIC:
+            raise ValueError("The shared memory block %r does not contain a frozen geojson file" % shm.name)
+        self._count = count
+        pos = headersize
+        self._bboxes = buf[pos:pos + count * 4 * 8].cast("d")
+        pos += count * 4 * 8
+        self._index = buf[pos:pos + (count + 1) * 5 * 8].cast(_INTCODE)
+        pos += (count + 1) * 5 * 8
+        self._coords = buf[pos:pos + ncoords * 8].cast("d")
+        pos += ncoords * 8
+        self._parts = buf[pos:pos + nparts * 8].cast(_INTCODE)
+        pos += nparts * 8
+        self._members = buf[pos:pos + membersize]
+        pos += membersize
+        self._meta = json.loads(bytes(buf[pos:pos + metasize]).decode("utf-8"))
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        """Get a feature based on its index, like frozenfile[7]"""
+        if index < 0: index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("feature index out of range")
+        i = index * 5
+        typecode,ndim,coordstart,partstart,memberstart = self._index[i:i+5]
+        coordend,partend,memberend = self._index[i+7:i+10]
+        featuredict = json.loads(bytes(self._members[memberstart:memberend]).decode("utf-8"))
+        if typecode:
+            coords = self._coords[coordstart:coordend].tolist()
+            parts = self._parts[partstart:partend].tolist()
+            positions = iter([coords[j:j+ndim] for j in range(0, len(coords), ndim)])
+            featuredict["geometry"] = {"type":_FROZENTYPES[typecode],
+                                       "coordinates":_unpackcoords(_FROZENDEPTHS[typecode], positions, iter(parts))}
+        else:
+            featuredict["geometry"] = None
+        return Feature(featuredict)
+
+    def __iter__(self):
+        """Iterates through and yields each feature in the file."""
+        for index in range(self._count):
+            yield self[index]
+
+    @property
+    def __geo_interface__(self):
+        geojdict = dict((key,value) for key,value in self._meta.items() if key not in ("all_attributes","common_attributes"))
+        geojdict["features"] = [feature._data for feature in self]
+        return geojdict
+
+    # Attributes
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def crs(self):
+        return self._meta.get("crs")
+
+    @property
+    def bbox(self):
+        return self._meta.get("bbox")
+
+    @property
+    def all_attributes(self):
+        return list(self._meta["all_attributes"])
+
+    @property
+    def common_attributes(self):
+        return list(self._meta["common_attributes"])
+
+    # Methods
+
+    def query(self, bbox):
+        """
+        Yields each feature whose geometry bbox intersects a region,
+        using the packed feature bboxes without decoding the other features. 
+
+        Parameters:
+
+        - **bbox**: The [xmin, ymin, xmax, ymax] region to query. 
+        """
+        if numpy is not None:
+            bboxes = numpy.frombuffer(self._bboxes, dtype=numpy.float64).reshape((self._count, 4))
+            matches = numpy.nonzero(_bboxintersects(bboxes.T, bbox))[0].tolist()
+            del bboxes
+        else:
+            bboxes = self._bboxes
+            matches = [index for index in range(self._count)
+                       if _bboxintersects(bboxes[index*4:index*4+4], bbox)]
+        for index in matches:
+            yield self[index]
+
+    def close(self):
+        """
+        Detaches this process from the shared memory, after which the instance can no longer be used. 
+        """
+        for view in (self._bboxes, self._index, self._coords, self._parts, self._members):
+            view.release()
+        self._shm.close()
+
+    def unlink(self):
+        """
+        Closes and destroys the shared memory block, which should only be
+        done by the process that froze the file, once no process needs it anymore. 
+        """
+        self.close()
+        self._shm.unlink()
+
+
+
+# Internal helpers
+
+# layout of frozen geojson files in shared memory
+_FROZENMAGIC = b"PYGEOJ01"
+_FROZENHEADER = "<8sqqqqq"
+_FROZENTYPES = (None, "Point", "MultiPoint", "LineString", "MultiLineString", "Polygon", "MultiPolygon")
+_FROZENDEPTHS = (0, 0, 1, 1, 2, 2, 3)
+
+def _firstposition(coords):
+    """Returns the first position of a coordinates structure."""
+    while coords and isinstance(coords[0], (list,tuple)):
+        coords = coords[0]
+    return coords
+
+def _packcoords(coords, depth, ndim, coordsout, partsout):
+    """Appends the positions of a coordinates structure to a flat array of values,
+    and the number of items at each nesting level to a parts array.
+    All positions must have ndim values."""
+    if depth == 0:
+        if len(coords) != ndim:
+            raise ValueError("All positions of a geometry must have the same number of dimensions to be frozen")
+        coordsout.extend(coords)
+    else:
+        partsout.append(len(coords))
+        for sub in coords:
+            _packcoords(sub, depth - 1, ndim, coordsout, partsout)
+
+def _unpackcoords(depth, positions, parts):
+    """Rebuilds a coordinates structure from iterators of positions and parts made by _packcoords()."""
+    if depth == 0:
+        return next(positions)
+    return [_unpackcoords(depth - 1, positions, parts) for _ in range(next(parts))]
+
+class _JsonStream(object):
+    """Reads json values one at a time from a file object,
+    so that large arrays can be consumed without loading the whole file."""
+
+    def __init__(self, fileobj, blocksize=65536, **kwargs):
+        self.fileobj = fileobj
+        self.blocksize = blocksize
+        self.decoder = json.JSONDecoder(**kwargs)
+        self.buf = ""
+        self.pos = 0
+        self.offset = 0
+        self.eof = False
+
+    def _fill(self):
+        # read at least as much as is already buffered, so that
+        # retrying very large values does not become quadratic
+        if self.eof: return False
+        chunk = self.fileobj.read(max(self.blocksize, len(self.buf) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.offset += self.pos
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def tell(self):
+        """The character position in the file up to which values have been consumed."""
+        return self.offset + self.pos
+
+    def peek(self):
+        """Skips whitespace and returns the next character, or None at the end of the file."""
+        while True:
+            buf,pos = self.buf,self.pos
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return None
+
+    def expect(self, chars):
+        """Consumes and returns the next character, which must be one of chars."""
+        char = self.peek()
+        if char is None or char not in chars:
+            raise ValueError("Invalid geojson file: expected one of %r but got %r" % (chars, char))
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decodes and returns the next json value."""
+        self.peek()
+        # call the decoder's scanner directly, skipping the per-value
+        # overhead of raw_decode since this runs once per feature
+        scan_once = self.decoder.scan_once
+        while True:
+            try:
+                obj,end = scan_once(self.buf, self.pos)
+            except ValueError:
+                if not self._fill(): raise
+                continue
+            except StopIteration:
+                if not self._fill(): raise ValueError("Invalid geojson file: expected a value at position %s" % self.tell())
+                continue
+            # a number at the end of the buffer may continue in the next block
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+def _iterfeatures(filepath, header=None, **kwargs):
+    """Streams and yields each feature dictionary of a geojson file,
+    without loading the whole file into memory.
+
+    If header is a dictionary, it is filled with all other toplevel
+    members of the file as they are encountered. Any other arguments
+    are passed on to the json decoder."""
+    with open(filepath, "r") as fileobj:
+        stream = _JsonStream(fileobj, **kwargs)
+        stream.expect("{")
+        if stream.peek() == "}": return
+        while True:
+            key = stream.value()
+            stream.expect(":")
+            if key == "features":
+                stream.expect("[")
+                if stream.peek() == "]":
+                    stream.expect("]")
+                else:
+                    while True:
+                        yield stream.value()
+                        if stream.expect(",]") == "]": break
+            else:
+                value = stream.value()
+                if header is not None: header[key] = value
+            if stream.expect(",}") == "}": break
+
+def _hasformatting(kwargs):
+    """Whether json dump arguments change the layout of the json text."""
+    return any(kwargs.get(key) not in (None, False) for key in ("indent", "separators", "sort_keys"))
+
+def _bboxintersects(bbox, other):
+    """Whether two [xmin, ymin, xmax, ymax] bboxes overlap or touch.
+    A bbox of NaN values never intersects. The bbox can also be given
+    as four NumPy arrays of values, to test many bboxes at once."""
+    return (bbox[0] <= other[2]) & (bbox[2] >= other[0]) & (bbox[1] <= other[3]) & (bbox[3] >= other[1])
+
+def _bboxunion(bboxes):
+    """Returns the bbox covering all bboxes of an iterable, skipping
+    any None or empty bboxes, or None if there are none."""
+    bboxes = [bbox for bbox in bboxes if bbox]
+    if not bboxes: return None
+    xmins, ymins, xmaxs, ymaxs = zip(*bboxes)
+    return [min(xmins), min(ymins), max(xmaxs), max(ymaxs)]
+
+def _positionsbbox(xs, ys):
+    """Returns the bbox of the x and y values of a batch of positions. Since the
+    holes of polygons lie within their exteriors, the positions of geometries
+    span the same bbox as the geometries themselves."""
+    return [min(xs), min(ys), max(xs), max(ys)]
+
+def _bboxjson(bbox, width=BBOX_WIDTH, **kwargs):
+    """Returns the json text of a bbox padded with spaces to a fixed width,
+    or of an empty padded array if bbox is None or empty."""
+    text = json.dumps(list(bbox or []), **kwargs)
+    return text[:-1] + " " * (width - len(text)) + "]"
+
+def _readheader(fileobj, blocksize=65536):
+    """Reads the toplevel members that come before the features array of a geojson
+    file opened in binary mode. Returns a dictionary of the members, a dictionary
+    of the (start, end) byte offsets of each member value, and the byte offset
+    right after the opening bracket of the features array, or None if the
+    features array could not be found."""
+    data = b""
+    while True:
+        chunk = fileobj.read(blocksize)
+        data += chunk
+        text = data.decode("utf-8", "ignore")
+        stream = _JsonStream(io.StringIO(text))
+        members,spans = {},{}
+        tobytes = lambda charpos: len(text[:charpos].encode("utf-8"))
+        try:
+            stream.expect("{")
+            while stream.peek() not in ("}", None):
+                key = stream.value()
+                stream.expect(":")
+                if key == "features":
+                    stream.expect("[")
+                    return members, spans, tobytes(stream.tell())
+                stream.peek()
+                start = stream.tell()
+                members[key] = stream.value()
+                spans[key] = (tobytes(start), tobytes(stream.tell()))
+                stream.expect(",}")
+            return members, spans, None
+        except ValueError:
+            # the header continues beyond what has been read so far
+            if not chunk: return members, spans, None
+
+def _featuresend(fileobj, featurestart, blocksize=4096):
+    """Returns the byte offset of the closing bracket of the features array, provided that
+    the features array is the last member of the geojson file opened in binary mode, or None."""
+    fileobj.seek(0, os.SEEK_END)
+    end = fileobj.tell()
+    start = max(end - blocksize, featurestart - 1)
+    fileobj.seek(start)
+    tail = fileobj.read(end - start).rstrip()
+    if not tail.endswith(b"}"): return None
+    tail = tail[:-1].rstrip()
+    if not tail.endswith(b"]"): return None
+    closing = start + len(tail) - 1
+    tail = tail[:-1].rstrip()
+    if tail.endswith(b"}"): return closing
+    # only an empty features array may end with an opening bracket
+    if tail.endswith(b"[") and start + len(tail) == featurestart: return closing
+    return None
+
+def _typedcolumn(values):
+    """Returns a (values, nullmask) tuple of typed arrays from a list of property values,
+    where None marks the null values."""
+    mask = [value is None for value in values]
+    types = set(type(value) for value in values if value is not None)
+    if not types: kind = None
+    elif types == set([bool]): kind = "bool"
+    elif all(t in integer_types for t in types): kind = "int"
+    elif all(t in integer_types or t is float for t in types): kind = "float"
+    else: kind = None
+    
+    if numpy is not None:
+        try:
+            if kind == "bool":
+                column = numpy.array([value or False for value in values], dtype=bool)
+            elif kind == "int":
+                column = numpy.array([value or 0 for value in values], dtype=numpy.int64)
+            elif kind == "float":
+                column = numpy.array([numpy.nan if value is None else value for value in values], dtype=numpy.float64)
+            else:
+                column = numpy.array(values, dtype=object)
+        except OverflowError:
+            column = numpy.array(values, dtype=object)
+        return column, numpy.array(mask, dtype=bool)
+    
+    try:
+        if kind == "bool":
+            # unsigned bytes, so that bool columns can be told apart from integers
+            column = array.array("B", [value or False for value in values])
+        elif kind == "int":
+            column = array.array(_INTCODE, [value or 0 for value in values])
+        elif kind == "float":
+            column = array.array("d", [float("nan") if value is None else value for value in values])
+        else:
+            column = values
+    except OverflowError:
+        column = values
+    return column, array.array("b", mask)
+
+def _isnullmask(obj):
+    """Whether an object is a null mask as made by _typedcolumn(),
+    either a boolean NumPy array or a signed byte array.array."""
+    if numpy is not None and isinstance(obj, numpy.ndarray):
+        return obj.dtype == bool
+    return isinstance(obj, array.array) and obj.typecode == "b"
+
+def _normcoords(coords, precision=None):
+    """Returns a copy of a coordinates structure as nested lists of floats,
+    optionally rounded, with negative zeros made positive."""
+    if coords and not isinstance(coords[0], (list,tuple)):
+        if precision is None:
+            return [float(v) + 0.0 for v in coords]
+        return [round(float(v), precision) + 0.0 for v in coords]
+    return [_normcoords(sub, precision) for sub in coords]
+
+def _geometryhash(geomdict, precision=None):
+    """Returns the hex hash of a geometry dictionary's type and normalized coordinates."""
+    if not geomdict:
+        normalized = ["Null", None]
+    else:
+        normalized = [geomdict.get("type"), _normcoords(geomdict.get("coordinates") or [], precision)]
+    return hashlib.sha1(json.dumps(normalized, separators=(",",":")).encode("utf-8")).hexdigest()
+
+def _featurehash(args):
+    """Returns the hex hash of a feature dictionary's geometry, properties, or both.
+    Takes a single (featuredict, on, precision) tuple so it can be mapped over a process pool."""
+    featuredict,on,precision = args
+    if on == "geometry":
+        return _geometryhash(featuredict.get("geometry"), precision)
+    propsjson = json.dumps(featuredict.get("properties") or {}, sort_keys=True, separators=(",",":"), default=repr)
+    propshash = hashlib.sha1(propsjson.encode("utf-8")).hexdigest()
+    if on == "properties":
+        return propshash
+    elif on == "both":
+        combined = _geometryhash(featuredict.get("geometry"), precision) + propshash
+        return hashlib.sha1(combined.encode("utf-8")).hexdigest()
+    raise ValueError('on must be either "geometry", "properties" or "both"')
+
+def _epsgcode(crs):
+    """Returns the epsg code of a crs name or code, recognizing the
+    common aliases of long/lat WGS84 and Web Mercator, or None."""
+    if isinstance(crs, int): code = crs
+    else:
+        name = crs.lower()
+        if name.endswith("crs84") or name.endswith("ogc:2:84"):
+            return 4326
+        match = re.search(r"epsg:+(\d+)$", name)
+        if not match: return None
+        code = int(match.group(1))
+    if code in (900913, 3785, 102100, 102113):
+        code = 3857
+    return code
+
+def _affineparams(matrix):
+    """Returns the (a, b, c, d, e, f) coefficients of an affine matrix."""
+    matrix = list(matrix)
+    # rows can be any sequence, such as those of a numpy array
+    if len(matrix) in (2,3) and all(hasattr(row, "__len__") for row in matrix):
+        if any(len(row) != 3 for row in matrix):
+            raise ValueError("A nested affine matrix must have rows of 3 values")
+        matrix = list(matrix[0]) + list(matrix[1])
+    if len(matrix) != 6:
+        raise ValueError("An affine matrix must be a sequence of 6 values or a nested 2x3 or 3x3 matrix")
+    return [float(v) for v in matrix]
+
+def _collectxy(coords, xs, ys):
+    """Appends the x and y values of all positions of a coordinates structure to the two lists."""
+    if not coords: return
+    first = coords[0]
+    if not isinstance(first, (list,tuple)):
+        xs.append(coords[0])
+        ys.append(coords[1])
+    elif first and not isinstance(first[0], (list,tuple)):
+        # a sequence of positions, collected in one go
+        xs.extend([position[0] for position in coords])
+        ys.extend([position[1] for position in coords])
+    else:
+        for sub in coords:
+            _collectxy(sub, xs, ys)
+
+def _rebuildxy(coords, xys):
+    """Returns a copy of a coordinates structure with the xy values of each position
+    taken in order from the xys iterator, keeping any z or m values."""
+    if not coords: return []
+    first = coords[0]
+    if not isinstance(first, (list,tuple)):
+        x,y = next(xys)
+        return [x,y] + list(coords[2:])
+    elif first and not isinstance(first[0], (list,tuple)):
+        return [list(next(xys)) + list(position[2:]) if len(position) > 2 else list(next(xys))
+                for position in coords]
+    return [_rebuildxy(sub, xys) for sub in coords]
+
+# spherical web mercator constants
+_EARTHRADIUS = 6378137.0
+_MAXLAT = 85.0511287798066
+
+def _transformxy(kind, params, xs, ys):
+    """Transforms lists of x and y values as one batch, and returns them as new lists."""
+    if numpy is not None:
+        xs = numpy.array(xs, dtype=numpy.float64)
+        ys = numpy.array(ys, dtype=numpy.float64)
+        if kind == "tomercator":
+            xs = numpy.radians(xs) * _EARTHRADIUS
+            ys = numpy.log(numpy.tan(math.pi / 4.0 + numpy.radians(numpy.clip(ys, -_MAXLAT, _MAXLAT)) / 2.0)) * _EARTHRADIUS
+        elif kind == "frommercator":
+            xs = numpy.degrees(xs / _EARTHRADIUS)
+            ys = numpy.degrees(2.0 * numpy.arctan(numpy.exp(ys / _EARTHRADIUS)) - math.pi / 2.0)
+        elif kind == "affine":
+            a,b,c,d,e,f = params
+            xs,ys = a*xs + b*ys + c, d*xs + e*ys + f
+        return xs.tolist(), ys.tolist()
+    
+    if kind == "tomercator":
+        radius,torad,quarter = _EARTHRADIUS, math.pi / 180.0, math.pi / 4.0
+        log,tan = math.log, math.tan
+        xs = [x * torad * radius for x in xs]
+        ys = [log(tan(quarter + min(max(y, -_MAXLAT), _MAXLAT) * torad / 2.0)) * radius for y in ys]
+    elif kind == "frommercator":
+        radius,todeg,half = _EARTHRADIUS, 180.0 / math.pi, math.pi / 2.0
+        atan,exp = math.atan, math.exp
+        xs = [x / radius * todeg for x in xs]
+        ys = [(2.0 * atan(exp(y / radius)) - half) * todeg for y in ys]
+    elif kind == "affine":
+        a,b,c,d,e,f = params
+        xs,ys = ([a*x + b*y + c for x,y in zip(xs,ys)],
+                 [d*x + e*y + f for x,y in zip(xs,ys)])
+    return xs,ys
+
+def _curvekeys(bboxes, filebbox, curve="hilbert", order=CURVE_ORDER):
+    """Computes the space filling curve key of the center of each bbox in a list
+    relative to the file bbox, in a single batch, with NumPy arrays when available.
+    None bboxes get a key after all others."""
+    if curve == "hilbert": keyfunc = _hilbertkey
+    elif curve == "zorder": keyfunc = _zorderkey
+    else: raise ValueError('curve must be either "hilbert" or "zorder"')
+    side = (1 << order) - 1
+    xmin,ymin,xmax,ymax = filebbox
+    xscale = side / float(xmax - xmin) if xmax > xmin else 0
+    yscale = side / float(ymax - ymin) if ymax > ymin else 0
+    nullkey = 1 << (2 * order)
+    if numpy is not None and order <= 31:
+        nan = float("nan")
+        boxes = numpy.array([bbox if bbox is not None else (nan,nan,nan,nan) for bbox in bboxes],
+                            dtype=numpy.float64).reshape((-1, 4))
+        isnull = numpy.isnan(boxes[:,0])
+        boxes[isnull] = 0
+        x = numpy.clip((((boxes[:,0] + boxes[:,2]) / 2.0 - xmin) * xscale).astype(numpy.int64), 0, side)
+        y = numpy.clip((((boxes[:,1] + boxes[:,3]) / 2.0 - ymin) * yscale).astype(numpy.int64), 0, side)
+        keys = _hilbertkeys(x, y, order) if curve == "hilbert" else _zorderkeys(x, y)
+        keys[isnull] = nullkey
+        return keys.tolist()
+    keys = []
+    for bbox in bboxes:
+        if bbox is None:
+            keys.append(nullkey)
+            continue
+        x = int(((bbox[0] + bbox[2]) / 2.0 - xmin) * xscale)
+        y = int(((bbox[1] + bbox[3]) / 2.0 - ymin) * yscale)
+        keys.append(keyfunc(min(max(x, 0), side), min(max(y, 0), side), order))
+    return keys
+
+def _hilbertkey(x, y, order):
+    """Distance of a grid cell along the hilbert curve."""
+    n = 1 << order
+    d = 0
+    s = n >> 1
+    while s:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        d += s * s * ((3 * rx) ^ ry)
+        if not ry:
+            if rx:
+                x = n - 1 - x
+                y = n - 1 - y
+            x,y = y,x
+        s >>= 1
+    return d
+
+def _hilbertkeys(x, y, order):
+    """Distances of NumPy arrays of grid cells along the hilbert curve."""
+    n = 1 << order
+    d = numpy.zeros(len(x), dtype=numpy.int64)
+    s = n >> 1
+    while s:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((3 * rx.astype(numpy.int64)) ^ ry.astype(numpy.int64))
+        flip = ~ry & rx
+        x = numpy.where(flip, n - 1 - x, x)
+        y = numpy.where(flip, n - 1 - y, y)
+        x,y = numpy.where(ry, x, y), numpy.where(ry, y, x)
+        s >>= 1
+    return d
+
+def _zorderkeys(x, y):
+    """Distances of NumPy arrays of grid cells along the z-order (morton) curve."""
+    def spread(v):
+        # spreads the lower 32 bits of each value out to every other bit
+        v = v.astype(numpy.uint64) & numpy.uint64(0xFFFFFFFF)
+        for shift,mask in ((16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF), (4, 0x0F0F0F0F0F0F0F0F),
+                           (2, 0x3333333333333333), (1, 0x5555555555555555)):
+            v = (v | (v << numpy.uint64(shift))) & numpy.uint64(mask)
+        return v
+    return (spread(x) | (spread(y) << numpy.uint64(1))).astype(numpy.int64)
+
+def _spreadbits(v):
+    # spreads the lower 16 bits of v out to every other bit
+    v &= 0xFFFF
+    v = (v | (v << 8)) & 0x00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F
+    v = (v | (v << 2)) & 0x33333333
+    v = (v | (v << 1)) & 0x55555555
+    return v
+
+def _zorderkey(x, y, order):
+    """Distance of a grid cell along the z-order (morton) curve."""
+    if order > 16:
+        return sum(((x >> i) & 1) << (2 * i) | ((y >> i) & 1) << (2 * i + 1) for i in range(order))
+    return _spreadbits(x) | (_spreadbits(y) << 1)
+
+# placeholder returned by the load hook for features that were filtered away
+_DROPPED = object()
+
+class _LoadHook(object):
+    """Json object_pairs_hook that dedupes key and string value objects
+    through a shared intern table while the file is being parsed,
+    keeping count of the duplicates it replaced.
+
+    It also holds the load filters, which are applied to each item of the
+    toplevel features array as it is streamed from the file, right after
+    the item has been validated."""
+    
+    def __init__(self, intern_keys=True, intern_values="auto", properties=None, bbox=None, where=None, geometry=True,
+                 skiperrors=False, fixerrors=True):
+        if intern_values not in (True, False, "auto"):
+            raise ValueError('intern_values must be True, False or "auto"')
+        self.intern_keys = intern_keys
+        self.intern_values = intern_values
+        self.interning = bool(intern_keys or intern_values)
+        # maps each string to its shared copy and that copy's size
+        self.table = {}
+        self.stats = {"keys":0, "values":0, "bytes_saved":0}
+
+        self.properties = list(properties) if properties is not None else None
+        self.bbox = list(bbox) if bbox is not None else None
+        self.where = where
+        self.geometry = geometry
+        self.filtering = (properties is not None or bbox is not None
+                          or where is not None or not geometry)
+        self.skiperrors = skiperrors
+        self.fixerrors = fixerrors
+
+    def filter_feature(self, featuredict):
+        """Returns the validated feature dictionary with the properties and
+        geometry filters applied, or _DROPPED if it should not be kept."""
+        feat = Feature(featuredict)
+        if self.skiperrors:
+            try: feat.validate(self.fixerrors)
+            except: return _DROPPED
+        else:
+            feat.validate(self.fixerrors)
+        featuredict = feat._data
+        if self.bbox is not None:
+            geom = feat.geometry
+            if geom.type == "Null" or not _bboxintersects(geom.bbox, self.bbox):
+                return _DROPPED
+        if self.where is not None:
+            if not self.where(feat):
+                return _DROPPED
+        if self.properties is not None:
+            props = featuredict["properties"]
+            featuredict = dict(featuredict)
+            featuredict["properties"] = dict((field,props[field]) for field in self.properties if field in props)
+        if not self.geometry:
+            featuredict = dict(featuredict)
+            featuredict["geometry"] = None
+        return featuredict
+
+    def filter_features(self, featuredicts):
+        """Returns a new list of only the kept and filtered feature dictionaries."""
+        filtered = (self.filter_feature(featuredict) for featuredict in featuredicts)
+        return [featuredict for featuredict in filtered if featuredict is not _DROPPED]
+
+    def __call__(self, pairs):
+        if not self.interning:
+            return dict(pairs)
+        intern_keys = self.intern_keys
+        intern_values = self.intern_values
+        table = self.table
+        keys = values = saved = 0
+        obj = {}
+        for key,value in pairs:
+            if intern_keys:
+                # a single table lookup per string, with sizes only computed once
+                entry = table.get(key)
+                if entry is None:
+                    table[key] = (key, sys.getsizeof(key))
+                elif entry[0] is not key:
+                    key = entry[0]
+                    keys += 1
+                    saved += entry[1]
+            if intern_values and isinstance(value, basestring):
+                if intern_values is True or len(value) <= INTERN_MAXLENGTH:
+                    entry = table.get(value)
+                    if entry is None:
+                        table[value] = (value, sys.getsizeof(value))
+                    elif entry[0] is not value:
+                        value = entry[0]
+                        values += 1
+                        saved += entry[1]
+            obj[key] = value
+        if keys or values:
+            stats = self.stats
+            stats["keys"] += keys
+            stats["values"] += values
+            stats["bytes_saved"] += saved
+        return obj
+
+
+
+def _validatecollection(data, fixerrors=True):
+    """Checks the toplevel members of the geojson data, without
+    validating the features themselves. Returns True if all goes well."""
     if not "type" in data:
         if fixerrors:
             data["type"] = "FeatureCollection"
@@ -762,6 +2073,22 @@ def validate(data, skiperrors=False, fixerrors=True):
         if not isinstance(data["features"], list):
             raise ValueError("The features property needs to be a list")
     else: raise ValueError("The FeatureCollection needs to contain a 'features' property")
+    return True
+
+
+
+# User functions
+
+def validate(data, skiperrors=False, fixerrors=True):
+    """Checks that the geojson data is a feature collection, that it
+    contains a proper "features" attribute, and that all features are valid too.
+    Returns True if all goes well.
+
+    - skiperrors will throw away any features that fail to validate.
+    - fixerrors will attempt to auto fix any minor errors without raising exceptions.
+    """
+
+    _validatecollection(data, fixerrors)
 
     if skiperrors:
         for featuredict in data["features"]:
@@ -792,6 +2119,15 @@ def load(filepath=None, data=None, **kwargs):
 
     - **filepath** (optional): The path of a geojson file to load.
     - **data** (optional): A complete geojson dictionary to load.
+    - **intern_keys** (optional): Dedupes property key strings while parsing a filepath (defaults to True). 
+    - **intern_values** (optional): Dedupes repeated string values while parsing a filepath,
+        either True, False, or "auto" to only intern short categorical strings (defaults to "auto").
+        The number of deduplicated strings and bytes saved are reported in the returned instance's intern_stats. 
+    - **properties** (optional): A list of property fields to keep, dropping all others. 
+    - **bbox** (optional): Only keep features whose geometry bbox intersects this [xmin, ymin, xmax, ymax] region. 
+    - **where** (optional): A function that receives each Feature instance and returns True if it should be kept. 
+    - **geometry** (optional): Set to False to drop all geometries and only keep the properties (defaults to True).
+        These filters are applied while parsing, so memory use scales with the selected data rather than the file size.
 
     Returns:
 
@@ -799,6 +2135,135 @@ def load(filepath=None, data=None, **kwargs):
     """
     return GeojsonFile(filepath, data, **kwargs)
 
+def sort_spatial(filepath, savepath, curve="hilbert", chunksize=100000):
+    """
+    Sorts the features of a geojson file along a space filling curve and saves
+    the result to a new file, for files that are too large to load into memory.
+    The file is streamed twice, once to get its bbox and once to sort chunks of
+    features into temporary files, which are then merged into the output file. 
+
+    Parameters:
+
+    - **filepath**: The path of the geojson file to sort. 
+    - **savepath**: Filepath to save the sorted file. 
+    - **curve** (optional): The type of space filling curve, either "hilbert" or "zorder" (defaults to "hilbert").
+    - **chunksize** (optional): The maximum number of features to hold in memory at a time (defaults to 100000).
+    """
+    # first pass finds the bbox of the file
+    header = {}
+    filebbox = None
+    for featuredict in _iterfeatures(filepath, header):
+        geom = Geometry(featuredict.get("geometry"))
+        if geom.type == "Null": continue
+        filebbox = _bboxunion([filebbox, geom.bbox])
+    header.pop("bbox", None)
+    if filebbox is not None:
+        header["bbox"] = filebbox
+    else:
+        filebbox = [0, 0, 0, 0]
+    
+    # second pass writes sorted chunks of keyed features to temporary files
+    runs = []
+    def writerun(bboxes, featurejsons, startseq):
+        keys = _curvekeys(bboxes, filebbox, curve)
+        chunk = sorted(zip(keys, range(startseq, startseq + len(keys)), featurejsons))
+        run = tempfile.TemporaryFile("w+")
+        for key,seq,featurejson in chunk:
+            run.write("%d\t%d\t%s\n" % (key, seq, featurejson))
+        run.seek(0)
+        runs.append(run)
+    bboxes, featurejsons, startseq = [], [], 0
+    for featuredict in _iterfeatures(filepath):
+        geom = Geometry(featuredict.get("geometry"))
+        bboxes.append(geom.bbox if geom.type != "Null" else None)
+        featurejsons.append(json.dumps(featuredict))
+        if len(featurejsons) >= chunksize:
+            writerun(bboxes, featurejsons, startseq)
+            startseq += len(featurejsons)
+            bboxes, featurejsons = [], []
+    writerun(bboxes, featurejsons, startseq)
+
+    # finally merge the sorted chunks into the new file
+    def readrun(run):
+        for line in run:
+            key,seq,featurejson = line.rstrip("\n").split("\t", 2)
+            yield int(key), int(seq), featurejson
+    try:
+        with open(savepath, "w") as fileobj:
+            fileobj.write("{")
+            for key,value in header.items():
+                fileobj.write("%s: %s, " % (json.dumps(key), json.dumps(value)))
+            fileobj.write('"features": [')
+            for i,(key,seq,featurejson) in enumerate(heapq.merge(*[readrun(run) for run in runs])):
+                if i: fileobj.write(", ")
+                fileobj.write(featurejson)
+            fileobj.write("]}")
+    finally:
+        for run in runs:
+            run.close()
+
+def append(filepath, features, **kwargs):
+    """
+    Appends features to the end of an existing geojson file without rewriting or
+    parsing the features already in it, so the cost only depends on the new features. 
+    The bbox of the file is updated in the fixed width space that save() reserves for it. 
+
+    Only files written by save() without formatting arguments are appended to in place,
+    as recognized by their padded bbox. Other files, for instance with members after the
+    features array, are instead loaded and saved in full, after which appending is fast. 
+    If the file does not exist it is created. 
+
+    Parameters:
+
+    - **filepath**: The path of the geojson file to append to. 
+    - **features**: A GeojsonFile instance or a sequence of anything that the add_feature() method can accept.
+    """
+    newfile = GeojsonFile()
+    for feature in features:
+        newfile.add_feature(feature)
+    validate(newfile._data)
+    if not os.path.exists(filepath):
+        newfile.save(filepath, **kwargs)
+        return
+
+    with open(filepath, "r+b") as fileobj:
+        members,spans,featurestart = _readheader(fileobj)
+
+        # only files laid out by save() are known to end with the features array,
+        # which is recognized by the padded bbox it reserves before the features
+        closing = None
+        if featurestart is not None and "bbox" in spans:
+            start,end = spans["bbox"]
+            fileobj.seek(start)
+            if end - start == BBOX_WIDTH and fileobj.read(end - start).endswith(b" ]"):
+                closing = _featuresend(fileobj, featurestart)
+
+        # combine the bboxes of the existing file and the new features
+        bboxjson = None
+        if closing is not None:
+            newfile.update_bbox()
+            # the reserved bbox is an empty array while there are no geometries
+            bboxjson = _bboxjson(_bboxunion([members["bbox"], newfile._data.get("bbox")]))
+            if len(bboxjson) != BBOX_WIDTH:
+                closing = None
+
+        if closing is not None:
+            featurejsons = [json.dumps(featuredict, **kwargs) for featuredict in newfile._data["features"]]
+            fileobj.seek(closing)
+            fileobj.write((", " if closing > featurestart else "").encode("utf-8"))
+            fileobj.write(", ".join(featurejsons).encode("utf-8"))
+            fileobj.write(b"]}")
+            fileobj.truncate()
+            fileobj.seek(spans["bbox"][0])
+            fileobj.write(bboxjson.encode("utf-8"))
+            return
+
+    # the file layout does not allow appending in place, so rewrite it
+    geojfile = load(filepath)
+    for featuredict in newfile._data["features"]:
+        geojfile.add_feature(featuredict)
+    geojfile.save(filepath, **kwargs)
+
 def new():
     """
     Creates a new empty geojson file instance.
@@ -809,6 +2274,50 @@ def new():
     """
     return GeojsonFile()
 
+def attach(name):
+    """
+    Attaches to a geojson file that another process has frozen into shared memory
+    with GeojsonFile.freeze(). 
+
+    Parameters:
+
+    - **name**: The name of the shared memory block. 
+
+    Returns:
+
+    - A read-only FrozenGeojsonFile instance. 
+    """
+    return FrozenGeojsonFile(name)
+
+def open_dataset(paths, cachepath=None, workers=4, **kwargs):
+    """
+    Opens many geojson files as a single virtual dataset, without loading them
+    until their features are needed. 
+
+    Parameters:
+
+    - **paths**: A glob pattern such as "data/*.geojson", a directory of .geojson
+        and .json files, or a sequence of file paths. 
+    - **cachepath** (optional): The path of a json file in which to keep the file summaries between sessions. 
+    - **workers** (optional): The number of threads to load files with (defaults to 4).
+
+    Any other arguments are passed on to load() when loading each file. 
+
+    Returns:
+
+    - A GeojsonDataset instance. 
+    """
+    if isinstance(paths, basestring):
+        if os.path.isdir(paths):
+            paths = (glob.glob(os.path.join(paths, "*.geojson"))
+                     + glob.glob(os.path.join(paths, "*.json")))
+        else:
+            paths = glob.glob(paths)
+        if cachepath:
+            paths = [path for path in paths if os.path.abspath(path) != os.path.abspath(cachepath)]
+        paths = sorted(paths)
+    return GeojsonDataset(paths, cachepath=cachepath, workers=workers, **kwargs)
+
 
 
 
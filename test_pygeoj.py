@@ -0,0 +1,486 @@
+import json
+import multiprocessing
+import os
+import random
+
+import pytest
+
+import pygeoj
+
+
+def _point(x, y, **properties):
+    return {"type":"Feature",
+            "geometry":{"type":"Point", "coordinates":[x,y]},
+            "properties":properties}
+
+def _readjson(path):
+    with open(path) as fileobj:
+        return json.load(fileobj)
+
+
+# Interning
+
+def _internfile(tmp_path):
+    path = str(tmp_path / "intern.geojson")
+    testfile = pygeoj.new()
+    for i in range(3):
+        testfile.add_feature(_point(i, i, cat="forest", note="x" * 100))
+    testfile.save(path)
+    return path
+
+def test_intern_values(tmp_path):
+    path = _internfile(tmp_path)
+    testfile = pygeoj.load(path)
+    cats = [feat.properties["cat"] for feat in testfile]
+    notes = [feat.properties["note"] for feat in testfile]
+    assert cats[0] is cats[1] is cats[2]
+    # long values are not interned by default
+    assert notes[0] is not notes[1]
+    # the repeated "forest", "Feature" and "Point" strings, and the crs "name" type shared with its key
+    assert testfile.intern_stats["values"] == 7
+    assert testfile.intern_stats["bytes_saved"] > 0
+
+    testfile = pygeoj.load(path, intern_values=True)
+    notes = [feat.properties["note"] for feat in testfile]
+    assert notes[0] is notes[1] is notes[2]
+    assert testfile.intern_stats["values"] == 9
+
+def test_intern_keys_and_disabled(tmp_path):
+    path = _internfile(tmp_path)
+    # each streamed feature is decoded separately, so its keys are new strings to intern
+    testfile = pygeoj.load(path, properties=["cat"], intern_values=False)
+    assert testfile.intern_stats["keys"] > 0
+    assert testfile.intern_stats["values"] == 0
+    keys = [list(feat.properties)[0] for feat in testfile]
+    assert keys[0] is keys[1] is keys[2]
+
+    testfile = pygeoj.load(path, intern_keys=False, intern_values=False)
+    assert testfile.intern_stats is None
+    assert pygeoj.load(data=json.loads(testfile.dumps())).intern_stats is None
+
+    with pytest.raises(ValueError):
+        pygeoj.load(path, intern_values="yes")
+
+
+# Appending
+
+def test_append_roundtrip(tmp_path):
+    path = str(tmp_path / "append.geojson")
+    testfile = pygeoj.new()
+    testfile.add_feature(_point(1, 1, id=0))
+    testfile.save(path)
+
+    pygeoj.append(path, [_point(5, -2, id=1), _point(3, 8, id=2)])
+    testfile.save(path, mode="append")
+
+    data = _readjson(path)
+    assert [feat["properties"]["id"] for feat in data["features"]] == [0, 1, 2, 0]
+    assert data["bbox"] == [1, -2, 5, 8]
+    assert len(pygeoj.load(path)) == 4
+
+def test_append_to_empty_file(tmp_path):
+    path = str(tmp_path / "empty.geojson")
+    pygeoj.new().save(path)
+    pygeoj.append(path, [_point(2, 3)])
+    pygeoj.append(path, [_point(4, 5)])
+
+    data = _readjson(path)
+    assert len(data["features"]) == 2
+    assert data["bbox"] == [2, 3, 4, 5]
+
+def test_append_without_geometries_in_place(tmp_path, monkeypatch):
+    path = str(tmp_path / "nulls.geojson")
+    testfile = pygeoj.new()
+    testfile.add_feature(geometry=None, properties={"id":0})
+    testfile.save(path)
+    assert _readjson(path)["bbox"] == []
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the file should be appended to in place")
+    monkeypatch.setattr(pygeoj, "load", fail)
+    pygeoj.append(path, [{"type":"Feature", "geometry":None, "properties":{"id":1}}])
+    assert _readjson(path)["bbox"] == []
+    pygeoj.append(path, [_point(2, 3, id=2)])
+
+    data = _readjson(path)
+    assert [feat["properties"]["id"] for feat in data["features"]] == [0, 1, 2]
+    assert data["bbox"] == [2, 3, 2, 3]
+
+def test_append_with_trailing_member(tmp_path):
+    path = str(tmp_path / "ogc.geojson")
+    with open(path, "w") as fileobj:
+        json.dump({"type":"FeatureCollection",
+                   "bbox":[0,-5,10,3],
+                   "features":[_point(1, 1)],
+                   "links":[{"href":"http://example.com"}]}, fileobj)
+
+    pygeoj.append(path, [_point(20, 20)])
+
+    data = _readjson(path)
+    assert len(data["features"]) == 2
+    assert data["links"] == [{"href":"http://example.com"}]
+    assert data["bbox"] == [1, 1, 20, 20]
+
+def test_save_formatting_arguments(tmp_path):
+    path = str(tmp_path / "indent.geojson")
+    testfile = pygeoj.new()
+    testfile.add_feature(_point(1, 2))
+    testfile.save(path, indent=2, sort_keys=True)
+
+    with open(path) as fileobj:
+        text = fileobj.read()
+    assert text == json.dumps(testfile._data, indent=2, sort_keys=True)
+
+    # appending to a formatted file falls back to a full rewrite
+    pygeoj.append(path, [_point(3, 4)])
+    assert len(_readjson(path)["features"]) == 2
+
+
+# Streaming dumps
+
+def test_iterdumps_chunks():
+    testfile = pygeoj.new()
+    for i in range(100):
+        testfile.add_feature(_point(i, -i, name=u"f\xe9ature %s" % i))
+    chunks = list(testfile.iterdumps(chunk_size=256))
+    assert len(chunks) > 1
+    assert all(len(chunk) >= 256 for chunk in chunks[:-1])
+    assert json.loads(b"".join(chunks).decode("utf-8")) == json.loads(testfile.dumps())
+
+def test_iterdumps_empty_and_stored_bbox(monkeypatch):
+    testfile = pygeoj.new()
+    assert json.loads(b"".join(testfile.iterdumps()).decode("utf-8")) == json.loads(testfile.dumps())
+
+    testfile.add_feature(_point(1, 2))
+    testfile._data["bbox"] = [-1, -1, 99, 99]
+    def fail():
+        raise AssertionError("the stored bbox should not be recalculated")
+    monkeypatch.setattr(testfile, "update_bbox", fail)
+    data = json.loads(b"".join(testfile.iterdumps()).decode("utf-8"))
+    assert data["bbox"] == [-1, -1, 99, 99]
+    assert len(data["features"]) == 1
+
+
+# Filtered loading
+
+def _nestedfile(tmp_path):
+    path = str(tmp_path / "nested.geojson")
+    nested = _point(100, 100)
+    with open(path, "w") as fileobj:
+        json.dump({"type":"FeatureCollection",
+                   "bbox":[0,-5,10,3],
+                   "features":[_point(0, -5, source=nested), _point(10, 3, name="b")]}, fileobj)
+    return path
+
+def test_filtered_load_recalculates_bbox(tmp_path):
+    path = _nestedfile(tmp_path)
+    testfile = pygeoj.load(path, bbox=[5,-10,20,5])
+    assert len(testfile) == 1
+    assert testfile.bbox == [10, 3, 10, 3]
+
+    testfile = pygeoj.load(path, where=lambda feat: "name" in feat.properties)
+    assert testfile.bbox == [10, 3, 10, 3]
+
+    testfile = pygeoj.load(path, geometry=False)
+    assert len(testfile) == 2
+    assert testfile.bbox is None
+
+def test_filtered_load_keeps_nested_features(tmp_path):
+    path = _nestedfile(tmp_path)
+    testfile = pygeoj.load(path, bbox=[-1,-10,5,0], properties=["source"])
+    assert len(testfile) == 1
+    assert testfile[0].properties["source"] == _point(100, 100)
+    assert json.loads(testfile.dumps())["features"][0]["properties"]["source"] == _point(100, 100)
+
+def test_filtered_load_validates_each_feature(tmp_path):
+    path = str(tmp_path / "lowercase.geojson")
+    polygon = {"type":"Feature", "properties":{"name":"a"},
+               "geometry":{"type":"polygon", "coordinates":[[[0,0],[1,0],[1,1],[0,0]]]}}
+    with open(path, "w") as fileobj:
+        json.dump({"type":"FeatureCollection",
+                   "features":[polygon, {"type":"Feature", "geometry":None}]}, fileobj)
+
+    testfile = pygeoj.load(path, bbox=[0,0,2,2])
+    assert len(testfile) == 1
+    assert testfile[0].geometry.type == "Polygon"
+
+    testfile = pygeoj.load(path, where=lambda feat: feat.properties.get("name") is None)
+    assert len(testfile) == 1
+    assert testfile[0].properties == {}
+
+def test_filtered_load_leaves_data_untouched():
+    data = {"type":"FeatureCollection", "bbox":[1,1,5,5],
+            "features":[_point(1, 1, name="a"), _point(5, 5, name="b")]}
+    testfile = pygeoj.load(data=data, bbox=[4,4,6,6], properties=[])
+    assert len(testfile) == 1
+    assert testfile[0].properties == {}
+    assert len(data["features"]) == 2
+    assert data["bbox"] == [1,1,5,5]
+    assert data["features"][0]["properties"] == {"name":"a"}
+
+
+# Transforms
+
+def _approx(coords):
+    if isinstance(coords, list):
+        return [_approx(sub) for sub in coords]
+    return pytest.approx(coords, abs=1e-6)
+
+def test_transform_mercator_roundtrip():
+    testfile = pygeoj.new()
+    testfile.add_feature(geometry={"type":"Polygon", "coordinates":[[[0,0,7],[10,0,8],[10,89,9],[0,0,7]]]})
+    testfile.add_feature(_point(-180, -45))
+    testfile.add_feature(geometry=None)
+
+    testfile.transform("EPSG:3857")
+    assert testfile.crs["properties"]["name"] == "urn:ogc:def:crs:EPSG::3857"
+    maxy = pygeoj._EARTHRADIUS * pygeoj.math.pi
+    assert testfile.bbox == _approx([-maxy, -5621521.486192, 1113194.907933, maxy])
+    # latitudes beyond the mercator limit are clipped
+    assert testfile[0].geometry.coordinates[0][2][1] == pytest.approx(maxy)
+
+    testfile.transform(4326)
+    assert testfile.crs["properties"]["name"] == "urn:ogc:def:crs:OGC:2:84"
+    # z values are kept
+    assert testfile[0].geometry.coordinates == _approx([[[0,0,7],[10,0,8],[10,pygeoj._MAXLAT,9],[0,0,7]]])
+    assert testfile[1].geometry.coordinates == _approx([-180, -45])
+    assert testfile.bbox == _approx([-180, -45, 10, pygeoj._MAXLAT])
+
+    with pytest.raises(ValueError):
+        testfile.transform("EPSG:32633")
+
+def test_transform_affine_matrices():
+    testfile = pygeoj.new()
+    testfile.add_feature(_point(1, 2))
+    testfile.add_feature(_point(3, 4))
+    testfile.transform([2,0,1, 0,1,-1])
+    assert [feat.geometry.coordinates for feat in testfile] == [[3, 1], [7, 3]]
+    assert testfile.bbox == [3, 1, 7, 3]
+    assert testfile.crs["properties"]["name"] == "urn:ogc:def:crs:OGC:2:84"
+
+    testfile.transform([[1,0,0], [0,1,0], [0,0,1]])
+    assert testfile.bbox == [3, 1, 7, 3]
+    with pytest.raises(ValueError):
+        testfile.transform([1,0,0,1])
+
+@pytest.mark.skipif(pygeoj.numpy is None, reason="requires numpy")
+def test_transform_numpy_matrices():
+    numpy = pygeoj.numpy
+    testfile = pygeoj.new()
+    testfile.add_feature(_point(1, 2))
+    testfile.transform(numpy.eye(3))
+    testfile.transform(numpy.array([[1,0,5],[0,1,5]]))
+    assert testfile[0].geometry.coordinates == [6, 7]
+    assert testfile.bbox == [6, 7, 6, 7]
+
+
+# Columns
+
+@pytest.fixture(params=["numpy", "array"])
+def columnbackend(request, monkeypatch):
+    if request.param == "numpy":
+        if pygeoj.numpy is None:
+            pytest.skip("requires numpy")
+    else:
+        monkeypatch.setattr(pygeoj, "numpy", None)
+    return request.param
+
+def test_columns_roundtrip(columnbackend):
+    testfile = pygeoj.new()
+    testfile.add_feature(_point(0, 0, flag=True, n=1, score=0.5, mixed="a"))
+    testfile.add_feature(_point(1, 1, flag=False, n=None, score=2, mixed=3))
+    testfile.add_feature(_point(2, 2, flag=None, n=-7, extra="only"))
+    columns = testfile.to_columns()
+    assert sorted(columns) == ["extra", "flag", "mixed", "n", "score"]
+    values,mask = columns["n"]
+    assert list(mask) == [False, True, False]
+
+    rebuilt = pygeoj.GeojsonFile.from_columns([feat.geometry for feat in testfile], columns)
+    assert [feat.properties for feat in rebuilt] == [
+        {"flag":True, "n":1, "score":0.5, "mixed":"a", "extra":None},
+        {"flag":False, "n":None, "score":2.0, "mixed":3, "extra":None},
+        {"flag":None, "n":-7, "score":None, "mixed":None, "extra":"only"}]
+    assert [type(feat.properties["flag"]) for feat in rebuilt][:2] == [bool, bool]
+    assert rebuilt.bbox == [0, 0, 2, 2]
+
+def test_from_columns_sequences():
+    testfile = pygeoj.GeojsonFile.from_columns([_point(0, 0)["geometry"], _point(1, 1)["geometry"]],
+                                               {"tags":(["a"], ["b"]), "n":[1, 2]})
+    assert [feat.properties for feat in testfile] == [{"tags":["a"], "n":1}, {"tags":["b"], "n":2}]
+    with pytest.raises(ValueError):
+        pygeoj.GeojsonFile.from_columns([None], {"n":[1, 2]})
+
+
+# Spatial sorting
+
+@pytest.mark.parametrize("curve,expected", [("hilbert", [[0,0], [0,10], [10,10], [10,0], None]),
+                                            ("zorder", [[0,0], [10,0], [0,10], [10,10], None])])
+def test_sort_spatial_curves(curve, expected):
+    testfile = pygeoj.new()
+    testfile.add_feature(geometry=None)
+    for x,y in [(10,10), (0,10), (10,0), (0,0)]:
+        testfile.add_feature(_point(x, y))
+    testfile.sort_spatial(curve)
+    assert [feat.geometry.coordinates if feat.geometry.type != "Null" else None
+            for feat in testfile] == expected
+
+@pytest.mark.skipif(pygeoj.numpy is None, reason="requires numpy")
+@pytest.mark.parametrize("curve", ["hilbert", "zorder"])
+def test_curve_keys_without_numpy(curve, monkeypatch):
+    rand = random.Random(1)
+    bboxes = []
+    for _ in range(200):
+        x,y = rand.uniform(-180, 180), rand.uniform(-90, 90)
+        bboxes.append([x, y, x + rand.uniform(0, 5), y + rand.uniform(0, 5)])
+    bboxes[::7] = [None] * len(bboxes[::7])
+    filebbox = [-180, -90, 185, 95]
+
+    keys = pygeoj._curvekeys(bboxes, filebbox, curve)
+    monkeypatch.setattr(pygeoj, "numpy", None)
+    assert pygeoj._curvekeys(bboxes, filebbox, curve) == keys
+
+def test_sort_spatial_file_in_chunks(tmp_path):
+    rand = random.Random(2)
+    testfile = pygeoj.new()
+    for i in range(50):
+        testfile.add_feature(_point(rand.uniform(0, 100), rand.uniform(0, 100), id=i))
+    testfile.add_feature(geometry=None, properties={"id":50})
+    path = str(tmp_path / "unsorted.geojson")
+    savepath = str(tmp_path / "sorted.geojson")
+    testfile.save(path)
+
+    pygeoj.sort_spatial(path, savepath, chunksize=8)
+    testfile.sort_spatial()
+    assert [feat.properties["id"] for feat in pygeoj.load(savepath)] == [feat.properties["id"] for feat in testfile]
+
+
+# Frozen files
+
+def _readfrozen(name):
+    frozen = pygeoj.attach(name)
+    try:
+        return (len(frozen), frozen.bbox, frozen[1].properties,
+                frozen[2].geometry.coordinates, len(list(frozen.query([0,0,2,2]))))
+    finally:
+        frozen.close()
+
+@pytest.mark.skipif(pygeoj.shared_memory is None, reason="requires multiprocessing.shared_memory")
+def test_freeze_attach_spawned_process():
+    testfile = pygeoj.new()
+    testfile.add_feature(_point(1, 1, name="a"))
+    testfile.add_feature(_point(5, 5, name="b"))
+    testfile.add_feature(geometry={"type":"Polygon", "coordinates":[[[0,0],[4,0],[4,4],[0,0]],
+                                                                    [[1,1],[2,1],[2,2],[1,1]]]})
+    frozen = testfile.freeze()
+    try:
+        context = multiprocessing.get_context("spawn")
+        pool = context.Pool(1)
+        try:
+            result = pool.apply(_readfrozen, (frozen.name,))
+        finally:
+            pool.close()
+            pool.join()
+        assert result == (3, [0, 0, 5, 5], {"name":"b"},
+                          [[[0,0],[4,0],[4,4],[0,0]], [[1,1],[2,1],[2,2],[1,1]]], 2)
+        assert frozen.all_attributes == ["name"]
+        assert frozen.common_attributes == []
+    finally:
+        frozen.unlink()
+
+@pytest.mark.skipif(pygeoj.shared_memory is None, reason="requires multiprocessing.shared_memory")
+def test_freeze_null_properties_and_mixed_dimensions():
+    testfile = pygeoj.new()
+    testfile.add_feature(_point(1, 2))
+    testfile._data["features"][0]["properties"] = None
+    testfile.add_feature(geometry=None)
+    frozen = testfile.freeze()
+    try:
+        assert frozen.all_attributes == []
+        assert frozen[0].geometry.coordinates == [1, 2]
+        # null geometries never match a query
+        assert len(list(frozen.query([-180,-90,180,90]))) == 1
+    finally:
+        frozen.unlink()
+
+    testfile.add_feature(geometry={"type":"LineString", "coordinates":[[0,0,1],[2,2]]})
+    with pytest.raises(ValueError):
+        testfile.freeze()
+
+
+# Datasets
+
+def test_dataset_cache_invalidation(tmp_path, monkeypatch):
+    for i in range(3):
+        shard = pygeoj.new()
+        shard.add_feature(_point(i * 10, i * 10, day=i))
+        shard.save(str(tmp_path / ("shard%s.geojson" % i)))
+    cachepath = str(tmp_path / "summaries.json")
+
+    dataset = pygeoj.open_dataset(str(tmp_path), cachepath=cachepath)
+    assert len(dataset.paths) == 3
+    assert len(dataset) == 3
+    assert dataset.bbox == [0, 0, 20, 20]
+
+    loaded = []
+    load = pygeoj.load
+    def spyload(filepath, *args, **kwargs):
+        loaded.append(os.path.basename(filepath))
+        return load(filepath, *args, **kwargs)
+    monkeypatch.setattr(pygeoj, "load", spyload)
+
+    # unchanged shards are summarized from the cache without being opened
+    dataset = pygeoj.open_dataset(str(tmp_path / "*.geojson"), cachepath=cachepath)
+    assert len(dataset) == 3
+    assert loaded == []
+
+    # modified shards are summarized again
+    pygeoj.append(str(tmp_path / "shard2.geojson"), [_point(30, 30, extra=True)])
+    dataset = pygeoj.open_dataset(str(tmp_path), cachepath=cachepath)
+    assert len(dataset) == 4
+    assert dataset.bbox == [0, 0, 30, 30]
+    assert sorted(dataset.all_attributes) == ["day", "extra"]
+    assert loaded == ["shard2.geojson"]
+
+    # queries only open the intersecting shards
+    del loaded[:]
+    features = list(dataset.query([25,25,35,35]))
+    assert [feat.properties for feat in features] == [{"extra":True}]
+    assert loaded == ["shard2.geojson"]
+
+
+# Duplicates
+
+def test_drop_duplicates_with_precision():
+    testfile = pygeoj.new()
+    testfile.add_feature(_point(1, 2, name="a"))
+    testfile.add_feature(_point(1.0000001, 2, name="a"))
+    testfile.add_feature(_point(1.0, 2.0, name="b"))
+    testfile.add_feature(_point(3, 4, name="a"))
+
+    assert testfile[0].geometry.content_hash() != testfile[1].geometry.content_hash()
+    assert testfile[0].geometry.content_hash(precision=3) == testfile[1].geometry.content_hash(precision=3)
+    assert testfile[0].geometry.content_hash() == testfile[2].geometry.content_hash()
+
+    assert testfile.drop_duplicates(on="both") == 0
+    assert testfile.drop_duplicates(on="both", precision=3) == 1
+    assert [feat.properties["name"] for feat in testfile] == ["a", "b", "a"]
+    assert testfile.drop_duplicates(on="geometry") == 1
+    assert [feat.geometry.coordinates for feat in testfile] == [[1, 2], [3, 4]]
+    assert testfile.drop_duplicates(on="properties", workers=2) == 1
+    assert [feat.geometry.coordinates for feat in testfile] == [[1, 2]]
+
+def test_drop_duplicates_with_workers(monkeypatch):
+    features = [_point(i % 4, 0, name="ab"[i % 3 == 0]) for i in range(20)]
+    serial = pygeoj.load(data={"type":"FeatureCollection", "features":features})
+    pooled = pygeoj.load(data={"type":"FeatureCollection", "features":[dict(feat) for feat in features]})
+
+    pools = []
+    Pool = multiprocessing.Pool
+    def spypool(*args, **kwargs):
+        pools.append(args)
+        return Pool(*args, **kwargs)
+    monkeypatch.setattr(multiprocessing, "Pool", spypool)
+
+    assert pooled.drop_duplicates(workers=2) == serial.drop_duplicates() == 12
+    assert pools == [(2,)]
+    assert [feat.__geo_interface__ for feat in pooled] == [feat.__geo_interface__ for feat in serial]